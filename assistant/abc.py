@@ -8,7 +8,7 @@ from openai.types.chat.chat_completion_message import ChatCompletionMessage
 from redbot.core import commands
 from redbot.core.bot import Red
 
-from .common.models import DB, GuildSettings
+from .common.models import DB, Conversation, GuildSettings
 
 
 class CompositeMetaClass(CogMeta, ABCMeta):
@@ -45,6 +45,10 @@ class MixinMeta(ABC):
     async def request_embedding(self, text: str, conf: GuildSettings) -> List[float]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def request_embeddings(self, texts: List[str], conf: GuildSettings) -> List[List[float]]:
+        raise NotImplementedError
+
     @abstractmethod
     async def can_call_llm(self, conf: GuildSettings, ctx: Optional[commands.Context] = None) -> bool:
         raise NotImplementedError
@@ -65,6 +69,10 @@ class MixinMeta(ABC):
     async def count_payload_tokens(self, messages: List[dict], model: str = "gpt-4o-mini") -> int:
         raise NotImplementedError
 
+    @abstractmethod
+    async def count_conversation_tokens(self, conversation: Conversation, model: str = "gpt-4o-mini") -> int:
+        raise NotImplementedError
+
     @abstractmethod
     async def count_function_tokens(self, functions: List[dict], model: str = "gpt-4o-mini") -> int:
         raise NotImplementedError
@@ -73,6 +81,10 @@ class MixinMeta(ABC):
     async def count_tokens(self, text: str, model: str) -> int:
         raise NotImplementedError
 
+    @abstractmethod
+    async def count_tokens_batch(self, texts: List[str], model: str = "gpt-4o-mini") -> List[int]:
+        raise NotImplementedError
+
     @abstractmethod
     async def get_tokens(self, text: str, model: str = "gpt-4o-mini") -> list[int]:
         raise NotImplementedError
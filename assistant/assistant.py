@@ -13,6 +13,7 @@ from redbot.core.bot import Red
 from .abc import CompositeMetaClass
 from .commands import AssistantCommands
 from .common.api import API
+from .common.calls import close_clients
 from .common.chat import ChatHandler
 from .common.constants import (
     CREATE_MEMORY,
@@ -62,9 +63,9 @@ class Assistant(
 
     async def red_delete_data_for_user(self, *, requester, user_id: int):
         """No data to delete"""
-        for key in self.db.conversations.copy():
-            if key.split("-")[0] == str(user_id):
-                del self.db.conversations[key]
+        prefix = f"{user_id}-"
+        for key in [k for k in self.db.conversations if k.startswith(prefix)]:
+            del self.db.conversations[key]
 
     def __init__(self, bot: Red, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -86,6 +87,7 @@ class Assistant(
     async def cog_unload(self):
         self.save_loop.cancel()
         self.mp_pool.close()
+        await close_clients()
         self.bot.dispatch("assistant_cog_remove")
 
     async def init_cog(self):
@@ -202,6 +204,7 @@ class Assistant(
                     cleaned = True
                 new_embeddings[entry_name[:100]] = embedding
             conf.embeddings = new_embeddings
+            conf.invalidate_embeddings()
 
         health = "BAD (Cleaned)" if cleaned else "GOOD"
         log.info(f"Config health: {health}")
@@ -247,6 +250,7 @@ class Assistant(
         if not embedding:
             return None
         conf.embeddings[name] = Embedding(text=text, embedding=embedding, ai_created=ai_created, model=conf.embed_model)
+        conf.invalidate_embeddings()
         asyncio.create_task(self.save_conf())
         return embedding
 
@@ -1089,6 +1089,7 @@ class Admin(MixinMeta):
             return await ctx.send(_("Not wiping embedding data"))
         conf = self.db.get_conf(ctx.guild)
         conf.embeddings = {}
+        conf.invalidate_embeddings()
         await ctx.send(_("All embedding data has been wiped!"))
         await self.save_conf()
 
@@ -1101,8 +1102,9 @@ class Admin(MixinMeta):
         """
         if not yes_or_no:
             return await ctx.send(_("Not wiping conversations"))
+        suffix = f"-{ctx.guild.id}"
         for key, convo in self.db.conversations.items():
-            if ctx.guild.id == int(key.split("-")[2]):
+            if key.endswith(suffix):
                 convo.messages.clear()
         await ctx.send(_("Conversations have been wiped in this server!"))
         await self.save_conf()
@@ -1298,6 +1300,7 @@ class Admin(MixinMeta):
                 continue
 
             conf.embeddings[name] = Embedding(text=text, embedding=query_embedding, model=conf.embed_model)
+            conf.invalidate_embeddings()
             imported += 1
         await message.edit(content=_("{}\n**COMPLETE**").format(message_text))
         await ctx.send(_("Successfully imported {} embeddings!").format(humanize_number(imported)))
@@ -1341,6 +1344,9 @@ class Admin(MixinMeta):
                     )
                     continue
                 files.append(attachment.filename)
+            # Entries assigned before a file failed validation are kept, so invalidate after every file was processed
+            if imported:
+                conf.invalidate_embeddings()
             await ctx.send(
                 _("Imported the following files: `{}`\n{} embeddings imported").format(
                     humanize_list(files), humanize_number(imported)
@@ -1429,6 +1435,7 @@ class Admin(MixinMeta):
                     created=created_tz,
                     model=conf.embed_model,
                 )
+                conf.invalidate_embeddings()
                 imported += 1
 
             if imported:
@@ -1539,7 +1546,12 @@ class Admin(MixinMeta):
             return await ctx.send(_("There are no embeddings to export!"))
 
         async with ctx.typing():
-            dump = {name: em.model_dump() for name, em in conf.embeddings.items()}
+            dump = {}
+            for name, em in conf.embeddings.items():
+                # Keep the public export format as a float list, base64 is only used in the config
+                data = em.model_dump()
+                data.pop("embedding_b64")
+                dump[name] = {**data, "embedding": em.embedding.tolist()}
             json_buffer = BytesIO(orjson.dumps(dump))
             file = discord.File(json_buffer, filename="embeddings_export.json")
 
@@ -1999,6 +2011,7 @@ class Admin(MixinMeta):
             return await ctx.send(_("Not wiping embedding data"))
         for conf in self.db.configs.values():
             conf.embeddings = {}
+            conf.invalidate_embeddings()
         await ctx.send(_("All embedding data has been wiped for all servers!"))
         await self.save_conf()
 
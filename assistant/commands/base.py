@@ -27,7 +27,7 @@ from ..abc import MixinMeta
 from ..common.calls import request_image_raw
 from ..common.constants import IMAGE_COSTS, LOADING, READ_EXTENSIONS, TLDR_PROMPT
 from ..common.models import Conversation
-from ..common.utils import can_use, get_attachments
+from ..common.utils import can_use, get_attachments, normalize
 
 log = logging.getLogger("red.vrt.assistant.base")
 _ = Translator("Assistant", __file__)
@@ -196,7 +196,7 @@ If a file has no extension it will still try to read it only if it can be decode
             # Return the new RGB color
             return (green, blue)
 
-        convo_tokens = await self.count_payload_tokens(conversation.messages, conf.get_user_model(user))
+        convo_tokens = await self.count_conversation_tokens(conversation, conf.get_user_model(user))
         g, b = generate_color(messages, conf.get_user_max_retention(ctx.author))
         gg, bb = generate_color(convo_tokens, max_tokens)
         # Whatever limit is more severe get that color
@@ -531,7 +531,7 @@ If a file has no extension it will still try to read it only if it can be decode
             return await ctx.send(txt)
 
         new_mem_id = channel.id if conf.collab_convos else ctx.author.id
-        key = f"{new_mem_id}-{channel.id}-{ctx.guild.id}"
+        key = self.db.conversation_key(new_mem_id, channel.id, ctx.guild.id)
         if key in self.db.conversations:
             txt = _("This conversation has been overwritten in {}").format(channel.mention)
         else:
@@ -654,7 +654,12 @@ If a file has no extension it will still try to read it only if it can be decode
             if not query_embedding:
                 return await ctx.send(_("Failed to get embedding for your query"))
 
-            embeddings = await asyncio.to_thread(conf.get_related_embeddings, query_embedding, relatedness_override=0.1)
+            embeddings = await asyncio.to_thread(
+                conf.get_related_embeddings,
+                normalize(query_embedding),
+                relatedness_override=0.1,
+                normalized=True,
+            )
             if not embeddings:
                 return await ctx.send(_("No embeddings could be related to this query with the current settings"))
             for name, em, score, dimension in embeddings:
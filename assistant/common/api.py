@@ -3,6 +3,7 @@ import inspect
 import json
 import logging
 import math
+from collections import Counter
 from typing import List, Optional
 
 import aiohttp
@@ -16,9 +17,15 @@ from redbot.core.i18n import Translator, cog_i18n
 from redbot.core.utils.chat_formatting import box, humanize_number
 
 from ..abc import MixinMeta
-from .calls import request_chat_completion_raw, request_embedding_raw
+from .calls import (
+    MAX_EMBEDDING_INPUTS,
+    MAX_EMBEDDING_TOKENS,
+    request_chat_completion_raw,
+    request_embedding_raw,
+    request_embeddings_raw,
+)
 from .constants import MODELS
-from .models import GuildSettings
+from .models import Conversation, GuildSettings
 
 log = logging.getLogger("red.vrt.assistant.api")
 _ = Translator("Assistant", __file__)
@@ -118,6 +125,32 @@ class API(MixinMeta):
         )
         return response.data[0].embedding
 
+    async def request_embeddings(self, texts: List[str], conf: GuildSettings) -> List[List[float]]:
+        """Embed multiple texts using as few requests as possible, results are in the same order as the texts"""
+        # Split into batches that fit both the input count and the token limit of a single request
+        batches: List[List[str]] = []
+        batch, batch_tokens = [], 0
+        for text, tokens in zip(texts, await self.count_tokens_batch(texts, conf.embed_model)):
+            if batch and (len(batch) == MAX_EMBEDDING_INPUTS or batch_tokens + tokens > MAX_EMBEDDING_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+
+        embeddings = []
+        for batch in batches:
+            response: CreateEmbeddingResponse = await request_embeddings_raw(batch, conf.api_key, conf.embed_model)
+            conf.update_usage(
+                response.model,
+                response.usage.total_tokens,
+                response.usage.prompt_tokens,
+                0,
+            )
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda x: x.index))
+        return embeddings
+
     # -------------------------------------------------------
     # -------------------------------------------------------
     # ----------------------- HELPERS -----------------------
@@ -136,18 +169,29 @@ class API(MixinMeta):
 
             tokens_per_message = 3
             tokens_per_name = 1
-            num_tokens = 0
-            for message in messages:
-                num_tokens += tokens_per_message
-                for key, value in message.items():
-                    num_tokens += len(encoding.encode(str(value)))
-                    if key == "name":
-                        num_tokens += tokens_per_name
+            num_tokens = tokens_per_message * len(messages)
+            num_tokens += tokens_per_name * sum(1 for message in messages if "name" in message)
+            values = [str(value) for message in messages for value in message.values()]
+            num_tokens += sum(len(tokens) for tokens in encoding.encode_ordinary_batch(values))
             num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
             return num_tokens
 
         return await asyncio.to_thread(_count_payload)
 
+    async def count_conversation_tokens(self, conversation: Conversation, model: str = "gpt-4o-mini") -> int:
+        """Same as count_payload_tokens but only encodes messages that changed since the conversation was last counted"""
+        if not conversation.messages:
+            return 0
+
+        def _count_conversation():
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+            return conversation.count_tokens(encoding)
+
+        return await asyncio.to_thread(_count_conversation)
+
     async def count_function_tokens(self, functions: List[dict], model: str = "gpt-4o-mini") -> int:
         # Initialize function settings to 0
         func_init = 0
@@ -262,6 +306,20 @@ class API(MixinMeta):
             log.error(f"Failed to count tokens for: {text}", exc_info=e)
             return 0
 
+    async def count_tokens_batch(self, texts: List[str], model: str = "gpt-4o-mini") -> List[int]:
+        """Count tokens for multiple strings with a single batched encode"""
+        if not texts:
+            return []
+
+        def _count_batch():
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+            return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+        return await asyncio.to_thread(_count_batch)
+
     async def can_call_llm(self, conf: GuildSettings, ctx: Optional[commands.Context] = None) -> bool:
         if not conf.api_key:
             if ctx:
@@ -283,23 +341,26 @@ class API(MixinMeta):
         sample = list(conf.embeddings.values())[0]
         sample_embed = await self.request_embedding(sample.text, conf)
 
-        async def update_embedding(name: str, text: str):
-            conf.embeddings[name].embedding = await self.request_embedding(text, conf)
+        to_sync = [
+            name
+            for name, em in conf.embeddings.items()
+            if conf.embed_model != em.model or len(em.embedding) != len(sample_embed)
+        ]
+        if not to_sync:
+            return 0
+
+        embeddings = await self.request_embeddings([conf.embeddings[name].text for name in to_sync], conf)
+        for name, embedding in zip(to_sync, embeddings):
+            if name not in conf.embeddings:
+                # Deleted while the request was running
+                continue
+            conf.embeddings[name].set_embedding(embedding)
             conf.embeddings[name].update()
             conf.embeddings[name].model = conf.embed_model
             log.debug(f"Updated embedding: {name}")
-
-        synced = 0
-        tasks = []
-        for name, em in conf.embeddings.items():
-            if conf.embed_model != em.model or len(em.embedding) != len(sample_embed):
-                synced += 1
-                tasks.append(update_embedding(name, em.text))
-
-        if synced:
-            await asyncio.gather(*tasks)
-            await self.save_conf()
-        return synced
+        conf.invalidate_embeddings()
+        await self.save_conf()
+        return len(to_sync)
 
     def get_max_tokens(self, conf: GuildSettings, user: Optional[discord.Member]) -> int:
         user_max = conf.get_user_max_tokens(user)
@@ -375,14 +436,15 @@ class API(MixinMeta):
 
         log.debug(f"Degrading messages for {user} (total: {total_tokens}/max: {max_tokens})")
 
-        def count(role: str):
-            return sum(1 for msg in messages if msg["role"] == role)
+        # Role counts are tracked as messages get popped rather than recounted every iteration
+        role_counts = Counter(msg["role"] for msg in messages)
 
         async def pop(role: str) -> int:
             for idx, msg in enumerate(messages):
                 if msg["role"] != role:
                     continue
                 removed = messages.pop(idx)
+                role_counts[role] -= 1
                 reduction = 4
                 if "name" in removed:
                     reduction += 1
@@ -402,8 +464,8 @@ class API(MixinMeta):
         while True:
             iters += 1
             break_conditions = [
-                count("user") <= 1,
-                count("assistant") <= 1,
+                role_counts["user"] <= 1,
+                role_counts["assistant"] <= 1,
                 iters > 100,
             ]
             if any(break_conditions):
@@ -579,26 +641,23 @@ class API(MixinMeta):
         if not text:
             log.debug("No text to pagify!")
             return []
-        token_chunks = []
-        tokens = await self.get_tokens(text)
-        current_chunk = []
+        if isinstance(text, bytes):
+            text = text.decode(encoding="utf-8")
 
         max_tokens = min(conf.max_tokens - 100, MODELS[conf.model])
-        for token in tokens:
-            current_chunk.append(token)
-            if len(current_chunk) == max_tokens:
-                token_chunks.append(current_chunk)
-                current_chunk = []
-
-        if current_chunk:
-            token_chunks.append(current_chunk)
+        if max_tokens <= 0:
+            return [text]
 
-        text_chunks = []
-        for chunk in token_chunks:
-            text = await self.get_text(chunk)
-            text_chunks.append(text)
+        def _pagify():
+            try:
+                encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+            tokens = encoding.encode(text)
+            chunks = [tokens[i : i + max_tokens] for i in range(0, len(tokens), max_tokens)]
+            return encoding.decode_batch(chunks)
 
-        return text_chunks
+        return await asyncio.to_thread(_pagify)
 
     # -------------------------------------------------------
     # -------------------------------------------------------
@@ -688,20 +747,17 @@ class API(MixinMeta):
         return embeds
 
     async def get_embbedding_menu_embeds(self, conf: GuildSettings, place: int) -> List[discord.Embed]:
-        embeddings = sorted(conf.embeddings.items(), key=lambda x: x[0])
+        names = conf.get_sorted_embedding_keys()
         embeds = []
-        pages = math.ceil(len(embeddings) / 5)
+        pages = math.ceil(len(names) / 5)
         model = conf.get_user_model()
-        start = 0
-        stop = 5
-        for page in range(pages):
-            stop = min(stop, len(embeddings))
+        token_counts = await self.count_tokens_batch([conf.embeddings[name].text for name in names], model)
+        for page, start in enumerate(range(0, len(names), 5)):
             embed = discord.Embed(title=_("Embeddings"), color=discord.Color.blue())
             embed.set_footer(text=_("Page {}/{}").format(page + 1, pages))
-            num = 0
-            for i in range(start, stop):
-                name, embedding = embeddings[i]
-                tokens = await self.count_tokens(embedding.text, model)
+            for num, name in enumerate(names[start : start + 5]):
+                embedding = conf.embeddings[name]
+                tokens = token_counts[start + num]
                 text = (
                     box(f"{embedding.text[:30].strip()}...")
                     if len(embedding.text) > 33
@@ -729,10 +785,7 @@ class API(MixinMeta):
                     value=val,
                     inline=False,
                 )
-                num += 1
             embeds.append(embed)
-            start += 5
-            stop += 5
         if not embeds:
             embeds.append(discord.Embed(description=_("No embeddings have been added!"), color=discord.Color.purple()))
         return embeds
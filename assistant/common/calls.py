@@ -18,6 +18,28 @@ from tenacity import (
 from .constants import NO_SYSTEM_MESSAGES, SUPPORTS_SEED, SUPPORTS_TOOLS
 
 log = logging.getLogger("red.vrt.assistant.calls")
+# OpenAI allows up to 2048 inputs per embedding request
+MAX_EMBEDDING_INPUTS = 2048
+# OpenAI allows up to 300k tokens summed over all inputs per embedding request, keep some headroom
+MAX_EMBEDDING_TOKENS = 280_000
+
+
+# API key: client, closed when the cog unloads
+CLIENTS: t.Dict[str, openai.AsyncOpenAI] = {}
+
+
+def get_client(api_key: str) -> openai.AsyncOpenAI:
+    """Reuse one client per api key so connections are pooled across requests"""
+    if api_key not in CLIENTS:
+        CLIENTS[api_key] = openai.AsyncOpenAI(api_key=api_key)
+    return CLIENTS[api_key]
+
+
+async def close_clients():
+    """Close all cached clients and their connection pools"""
+    while CLIENTS:
+        _, client = CLIENTS.popitem()
+        await client.close()
 
 
 @retry(
@@ -43,7 +65,7 @@ async def request_chat_completion_raw(
     presence_penalty: float = 0.0,
     seed: int = None,
 ) -> ChatCompletion:
-    client = openai.AsyncOpenAI(api_key=api_key)
+    client = get_client(api_key)
 
     kwargs = {"model": model, "messages": messages}
 
@@ -101,7 +123,7 @@ async def request_embedding_raw(
     api_key: str,
     model: str,
 ) -> CreateEmbeddingResponse:
-    client = openai.AsyncOpenAI(api_key=api_key)
+    client = get_client(api_key)
     add_breadcrumb(
         category="api",
         message="Calling request_embedding_raw",
@@ -113,6 +135,36 @@ async def request_embedding_raw(
     return response
 
 
+@retry(
+    retry=retry_if_exception_type(
+        t.Union[
+            httpx.TimeoutException,
+            httpx.ReadTimeout,
+            openai.InternalServerError,
+        ]
+    ),
+    wait=wait_random_exponential(min=5, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+async def request_embeddings_raw(
+    texts: List[str],
+    api_key: str,
+    model: str,
+) -> CreateEmbeddingResponse:
+    """Embed multiple texts in a single request, texts should not exceed MAX_EMBEDDING_INPUTS"""
+    client = get_client(api_key)
+    add_breadcrumb(
+        category="api",
+        message="Calling request_embeddings_raw",
+        level="info",
+        data={"inputs": len(texts)},
+    )
+    response: CreateEmbeddingResponse = await client.embeddings.create(input=texts, model=model)
+    log.debug(f"request_embeddings_raw: {model} -> {response.model} ({len(texts)} inputs)")
+    return response
+
+
 @retry(
     retry=retry_if_exception_type(
         t.Union[
@@ -132,7 +184,7 @@ async def request_image_raw(
     quality: t.Literal["standard", "hd"] = "standard",
     style: t.Literal["natural", "vivid"] = "vivid",
 ) -> Image:
-    client = openai.AsyncOpenAI(api_key=api_key)
+    client = get_client(api_key)
     response: ImagesResponse = await client.images.generate(
         model="dall-e-3",
         prompt=prompt,
@@ -151,7 +203,7 @@ class CreateMemoryResponse(BaseModel):
 
 
 async def create_memory_call(messages: t.List[dict], api_key: str) -> t.Union[CreateMemoryResponse, None]:
-    client = openai.AsyncOpenAI(api_key=api_key)
+    client = get_client(api_key)
     response = await client.beta.chat.completions.parse(
         model="gpt-4o-2024-11-20",
         messages=messages,
@@ -40,6 +40,7 @@ from .utils import (
     extract_code_blocks_with_lang,
     get_attachments,
     get_params,
+    normalize,
     purge_images,
     remove_code_blocks,
 )
@@ -697,18 +698,19 @@ class ChatHandler(MixinMeta):
 
         initial_prompt = format_string(conf.prompt)
         model = conf.get_user_model(author)
-        current_tokens = await self.count_tokens(message + system_prompt + initial_prompt, model)
-        current_tokens += await self.count_payload_tokens(conversation.messages, model)
+        # Counted separately rather than joined since they are sent as separate messages anyway
+        current_tokens = sum(await self.count_tokens_batch([message, system_prompt, initial_prompt], model))
+        current_tokens += await self.count_conversation_tokens(conversation, model)
         current_tokens += await self.count_function_tokens(function_calls, model)
 
         max_tokens = self.get_max_tokens(conf, author)
 
-        related = await asyncio.to_thread(conf.get_related_embeddings, query_embedding)
+        related = await asyncio.to_thread(conf.get_related_embeddings, normalize(query_embedding), normalized=True)
 
         embeds: List[str] = []
         # Get related embeddings (Name, text, score, dimensions)
-        for i in related:
-            embed_tokens = await self.count_tokens(i[1], model)
+        embed_token_counts = await self.count_tokens_batch([i[1] for i in related], model)
+        for i, embed_tokens in zip(related, embed_token_counts):
             if embed_tokens + current_tokens > max_tokens:
                 log.debug("Cannot fit anymore embeddings")
                 break
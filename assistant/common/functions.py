@@ -12,6 +12,7 @@ from redbot.core.i18n import Translator, cog_i18n
 from ..abc import MixinMeta
 from ..common import calls, constants
 from .models import EmbeddingEntryExists, GuildSettings
+from .utils import normalize
 
 log = logging.getLogger("red.vrt.assistant.functions")
 _ = Translator("Assistant", __file__)
@@ -168,9 +169,10 @@ class AssistantFunctions(MixinMeta):
 
         embeddings = await asyncio.to_thread(
             conf.get_related_embeddings,
-            query_embedding=query_embedding,
+            query_embedding=normalize(query_embedding),
             top_n_override=amount,
             relatedness_override=0.5,
+            normalized=True,
         )
         if not embeddings:
             return f"No embeddings could be found related to the search query '{search_query}'"
@@ -202,9 +204,10 @@ class AssistantFunctions(MixinMeta):
             return "Could not update the memory!"
 
         conf.embeddings[memory_name].text = memory_text
-        conf.embeddings[memory_name].embedding = embedding
+        conf.embeddings[memory_name].set_embedding(embedding)
         conf.embeddings[memory_name].update()
         conf.embeddings[memory_name].model = conf.embed_model
+        conf.invalidate_embeddings()
         asyncio.create_task(self.save_conf())
         return "Your memory has been updated!"
 
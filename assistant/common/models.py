@@ -1,3 +1,4 @@
+import base64
 import logging
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
@@ -5,9 +6,20 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import discord
 import numpy as np
 import orjson
-from pydantic import VERSION, BaseModel, Field
+import tiktoken
+from pydantic import VERSION, BaseModel, Field, PrivateAttr
 from redbot.core.bot import Red
 
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+if VERSION > "1.10.15":
+    from pydantic import model_validator
+else:
+    from pydantic import root_validator
+
 log = logging.getLogger("red.vrt.assistant.models")
 
 
@@ -26,12 +38,50 @@ class AssistantBaseModel(BaseModel):
 
 class Embedding(AssistantBaseModel):
     text: str
-    embedding: List[float]
+    embedding_b64: str  # float16 vector, base64 encoded
     ai_created: bool = False
     created: datetime = Field(default_factory=lambda: datetime.now(tz=timezone.utc))
     modified: datetime = Field(default_factory=lambda: datetime.now(tz=timezone.utc))
     model: str = "text-embedding-3-small"
 
+    _vector: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    # Embeddings used to be stored as a list of floats
+    # Also allows creating an Embedding by passing the raw vector as "embedding"
+    if VERSION > "1.10.15":
+
+        @model_validator(mode="before")
+        @classmethod
+        def _pack_embedding(cls, data: Any):
+            if isinstance(data, dict) and "embedding" in data:
+                data = dict(data)
+                data["embedding_b64"] = cls.pack(data.pop("embedding"))
+            return data
+    else:
+
+        @root_validator(pre=True, allow_reuse=True)
+        def _pack_embedding(cls, data: Any):
+            if isinstance(data, dict) and "embedding" in data:
+                data = dict(data)
+                data["embedding_b64"] = cls.pack(data.pop("embedding"))
+            return data
+
+    @staticmethod
+    def pack(vector: Union[List[float], np.ndarray]) -> str:
+        """Encode a vector as base64 float16 bytes"""
+        return base64.b64encode(np.asarray(vector, dtype=np.float16).tobytes()).decode()
+
+    @property
+    def embedding(self) -> np.ndarray:
+        """The embedding vector as float32, decoded on first access"""
+        if self._vector is None:
+            self._vector = np.frombuffer(base64.b64decode(self.embedding_b64), dtype=np.float16).astype(np.float32)
+        return self._vector
+
+    def set_embedding(self, vector: Union[List[float], np.ndarray]) -> None:
+        self.embedding_b64 = self.pack(vector)
+        self._vector = None
+
     def created_at(self, relative: bool = False):
         t_type = "R" if relative else "F"
         return f"<t:{int(self.created.timestamp())}:{t_type}>"
@@ -118,16 +168,72 @@ class GuildSettings(AssistantBaseModel):
     disabled_functions: List[str] = []
     functions_called: int = 0
 
+    # Dimensions: (entry names, L2-normalized float32 matrix), rebuilt lazily
+    _embedding_matrices: Dict[int, Tuple[List[str], np.ndarray]] = PrivateAttr(default_factory=dict)
+    # Dimensions: (entry names, faiss inner product index over the normalized matrix), only used if faiss is installed
+    _embedding_indexes: Dict[int, Tuple[List[str], Any]] = PrivateAttr(default_factory=dict)
+    # Entry names in alphabetical order for the embedding menu
+    _sorted_keys: Optional[List[str]] = PrivateAttr(default=None)
+
+    def invalidate_embeddings(self) -> None:
+        """Clear the cached embedding matrices, must be called whenever embeddings are added, edited or removed"""
+        self._embedding_matrices = {}
+        self._embedding_indexes = {}
+        self._sorted_keys = None
+
+    def get_sorted_embedding_keys(self) -> List[str]:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.embeddings)
+        return self._sorted_keys
+
+    def get_embedding_index(self, dimensions: int) -> Tuple[List[str], Any]:
+        """Get the entry names and a faiss inner product index for all embeddings of the given dimensions"""
+        # Same as get_embedding_matrix, a build racing an invalidation lands in the discarded dict
+        cache = self._embedding_indexes
+        if dimensions in cache:
+            return cache[dimensions]
+        # The index keeps its own copy of the vectors, so the matrix is not cached alongside it
+        keys, matrix = self.build_embedding_matrix(dimensions)
+        index = faiss.IndexFlatIP(dimensions)
+        index.add(matrix)
+        cache[dimensions] = (keys, index)
+        return keys, index
+
+    def get_embedding_matrix(self, dimensions: int) -> Tuple[List[str], np.ndarray]:
+        """Get the cached entry names and normalized embedding matrix for all embeddings of the given dimensions"""
+        # This runs in a thread while invalidate_embeddings runs on the event loop, so hold onto the cache we started
+        # with. If it gets invalidated mid-build, the result lands in the discarded dict instead of the fresh one.
+        cache = self._embedding_matrices
+        if dimensions in cache:
+            return cache[dimensions]
+        keys, matrix = self.build_embedding_matrix(dimensions)
+        cache[dimensions] = (keys, matrix)
+        return keys, matrix
+
+    def build_embedding_matrix(self, dimensions: int) -> Tuple[List[str], np.ndarray]:
+        """Build the entry names and normalized embedding matrix for all embeddings of the given dimensions"""
+        entries = [(name, em) for name, em in list(self.embeddings.items()) if len(em.embedding) == dimensions]
+        keys = [name for name, _ in entries]
+        if not entries:
+            return keys, np.empty((0, dimensions), dtype=np.float32)
+        matrix = np.stack([em.embedding for _, em in entries])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix /= norms
+        return keys, matrix
+
     def get_related_embeddings(
         self,
-        query_embedding: List[float],
+        query_embedding: Union[List[float], np.ndarray],
         top_n_override: Optional[int] = None,
         relatedness_override: Optional[float] = None,
+        normalized: bool = False,
     ) -> List[Tuple[str, str, float, int]]:
-        def cosine_similarity(a, b):
-            return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+        """Get the most related embeddings to the query
 
-        if not query_embedding:
+        Pass normalized=True if the query was already L2-normalized (see utils.normalize) to skip doing it again
+        """
+        if query_embedding is None or not len(query_embedding):
             return []
 
         # Name, text, score, dimensions
@@ -138,25 +244,44 @@ class GuildSettings(AssistantBaseModel):
         if not top_n or q_length == 0 or not self.embeddings:
             return []
 
-        strings_and_relatedness = []
-        for name, em in self.embeddings.items():
-            if q_length != len(em.embedding):
-                continue
-            try:
-                score = cosine_similarity(query_embedding, em.embedding)
-                if score >= min_relatedness:
-                    strings_and_relatedness.append((name, em.text, score, len(em.embedding)))
-            except ValueError as e:
-                log.error(
-                    f"Failed to compare '{name}' embedding {q_length} - {len(em.embedding)}",
-                    exc_info=e,
-                )
-
-        if not strings_and_relatedness:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if not normalized:
+            norm = np.linalg.norm(query)
+            if not norm:
+                return []
+            query = query / norm
+
+        results = []
+        if faiss is not None:
+            keys, index = self.get_embedding_index(q_length)
+            if not keys:
+                return []
+            scores, ids = index.search(query.reshape(1, -1), min(top_n, len(keys)))
+            for score, i in zip(scores[0], ids[0]):
+                if i == -1 or score < min_relatedness:
+                    continue
+                # Entries can be removed while a search is running
+                if em := self.embeddings.get(keys[i]):
+                    results.append((keys[i], em.text, float(score), q_length))
+            return results
+
+        keys, matrix = self.get_embedding_matrix(q_length)
+        if not keys:
             return []
+        scores = matrix @ query
+
+        if top_n < len(scores):
+            indexes = np.argpartition(-scores, top_n - 1)[:top_n]
+        else:
+            indexes = np.arange(len(scores))
+        indexes = indexes[scores[indexes] >= min_relatedness]
+        indexes = indexes[np.argsort(-scores[indexes])]
 
-        strings_and_relatedness.sort(key=lambda x: x[2], reverse=True)
-        return strings_and_relatedness[:top_n]
+        for i in indexes:
+            # Entries can be removed while a search is running
+            if em := self.embeddings.get(keys[i]):
+                results.append((keys[i], em.text, float(scores[i]), q_length))
+        return results
 
     def update_usage(
         self,
@@ -225,11 +350,45 @@ class Conversation(AssistantBaseModel):
     last_updated: float = 0.0
     system_prompt_override: Optional[str] = None
 
+    # id(message): (message, snapshot, encoding name, tokens), see count_tokens
+    _token_counts: Dict[int, Tuple[dict, tuple, str, int]] = PrivateAttr(default_factory=dict)
+
     def function_count(self) -> int:
         if not self.messages:
             return 0
         return sum(i["role"] in ["function", "tool"] for i in self.messages)
 
+    def count_tokens(self, encoding: tiktoken.Encoding) -> int:
+        """Count the tokens of the conversation, only encoding messages that changed since the last count"""
+        counts = {}
+        pending = []
+        for message in list(self.messages):
+            values = [v if isinstance(v, str) else str(v) for v in message.values()]
+            # Non string values like image content can hold entire base64 images, so only their hash is kept
+            snapshot = tuple(
+                (k, v if isinstance(v, str) else hash(s)) for (k, v), s in zip(message.items(), values)
+            )
+            cached = self._token_counts.get(id(message))
+            if cached and cached[0] is message and cached[1] == snapshot and cached[2] == encoding.name:
+                counts[id(message)] = cached
+            else:
+                pending.append((message, snapshot, values))
+
+        if pending:
+            encoded = iter(encoding.encode_ordinary_batch([s for _, _, values in pending for s in values]))
+            for message, snapshot, values in pending:
+                tokens = 3  # tokens per message
+                if "name" in message:
+                    tokens += 1  # tokens per name
+                tokens += sum(len(next(encoded)) for _ in values)
+                counts[id(message)] = (message, snapshot, encoding.name, tokens)
+
+        # Entries for messages that are no longer in the conversation are dropped
+        self._token_counts = counts
+        if not counts:
+            return 0
+        return sum(entry[3] for entry in counts.values()) + 3  # every reply is primed with <|start|>assistant<|message|>
+
     def is_expired(self, conf: GuildSettings, member: Optional[discord.Member] = None):
         if not conf.get_user_max_time(member):
             return False
@@ -243,7 +402,10 @@ class Conversation(AssistantBaseModel):
         if any(clear):
             self.messages.clear()
         elif conf.max_retention:
-            self.messages = self.messages[-conf.get_user_max_retention(member) :]
+            # Trim in place and only when needed rather than copying the list on every cleanup
+            excess = len(self.messages) - conf.get_user_max_retention(member)
+            if excess > 0:
+                del self.messages[:excess]
 
     def reset(self):
         self.refresh()
@@ -356,14 +518,22 @@ class DB(AssistantBaseModel):
         gid = guild if isinstance(guild, int) else guild.id
         return self.configs.setdefault(gid, GuildSettings())
 
+    @staticmethod
+    def conversation_key(member_id: int, channel_id: int, guild_id: int) -> str:
+        # Keys stay strings since they are persisted as json object keys, the separator keeps them unambiguous
+        return f"{member_id}-{channel_id}-{guild_id}"
+
     def get_conversation(
         self,
         member_id: int,
         channel_id: int,
         guild_id: int,
     ) -> Conversation:
-        key = f"{member_id}-{channel_id}-{guild_id}"
-        return self.conversations.setdefault(key, Conversation())
+        key = self.conversation_key(member_id, channel_id, guild_id)
+        conversation = self.conversations.get(key)
+        if conversation is None:
+            conversation = self.conversations[key] = Conversation()
+        return conversation
 
     async def prep_functions(
         self,
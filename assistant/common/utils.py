@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import List, Optional, Tuple, Union
 
 import discord
+import numpy as np
 from openai.types.chat.chat_completion_message import ChatCompletionMessage
 from redbot.core import commands, version_info
 from redbot.core.bot import Red
@@ -39,18 +40,20 @@ def clean_name(name: str):
     return cleaned_name
 
 
+def normalize(vector: Union[List[float], np.ndarray]) -> np.ndarray:
+    """L2-normalize an embedding so it can be compared with a plain dot product"""
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return arr / norm if norm else arr
+
+
 def get_attachments(message: discord.Message) -> List[discord.Attachment]:
     """Get all attachments from context"""
-    attachments = []
-    if message.attachments:
-        direct_attachments = [a for a in message.attachments]
-        attachments.extend(direct_attachments)
-    if hasattr(message, "reference"):
-        try:
-            referenced_attachments = [a for a in message.reference.resolved.attachments]
-            attachments.extend(referenced_attachments)
-        except AttributeError:
-            pass
+    attachments = list(message.attachments)
+    # Resolved can be None or a DeletedReferencedMessage (which has no attachments)
+    resolved = message.reference.resolved if message.reference else None
+    if referenced := getattr(resolved, "attachments", None):
+        attachments.extend(referenced)
     return attachments
 
 
@@ -94,15 +97,15 @@ async def can_use(message: discord.Message, blacklist: list, respond: bool = Tru
 def embed_to_content(message: discord.Message) -> None:
     if not message.embeds or message.content is not None:
         return
-    extracted = ""
+    parts: List[str] = []
     embed = message.embeds[0]
     if title := embed.title:
-        extracted += f"# {title}\n"
+        parts.append(f"# {title}\n")
     if desc := embed.description:
-        extracted += f"{desc}\n"
+        parts.append(f"{desc}\n")
     for field in embed.fields:
-        extracted += f"## {field.name}\n{field.value}\n"
-    message.content = extracted
+        parts.append(f"## {field.name}\n{field.value}\n")
+    message.content = "".join(parts)
 
 
 def extract_code_blocks(content: str) -> List[str]:
@@ -1,3 +1,4 @@
+import asyncio
 import typing as t
 from abc import ABC, ABCMeta, abstractmethod
 
@@ -22,6 +23,8 @@ class MixinMeta(ABC):
 
         self.checks: set
         self.charged: t.Dict[str, int]
+        self.currency_names: t.Dict[int, t.Tuple[str, float]]
+        self.background_tasks: t.Set[asyncio.Task]
 
         self.payday_callback: t.Optional[t.Callable]
 
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import math
 import typing as t
+from time import monotonic
 
 import discord
 from redbot.core import bank, commands
@@ -16,14 +17,32 @@ from .utils import (
     ctx_to_dict,
     ctx_to_id,
     edit_delete_delay,
-    get_cached_credits_name,
 )
 
 log = logging.getLogger("red.vrt.extendedeconomy.checks")
 _ = Translator("ExtendedEconomy", __file__)
+# Seconds before a cached currency name is fetched again, in case it was changed without a listener firing
+CURRENCY_NAME_TTL = 600
 
 
 class Checks(MixinMeta):
+    def spawn_task(self, coro: t.Coroutine) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference so it isn't garbage collected before it finishes"""
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    async def get_credits_name(self, guild: t.Optional[discord.Guild]) -> str:
+        """Get the currency name, cached per guild until it is changed or expires"""
+        key = guild.id if guild else 0
+        cached = self.currency_names.get(key)
+        if cached is not None and monotonic() - cached[1] < CURRENCY_NAME_TTL:
+            return cached[0]
+        currency = await bank.get_currency_name(guild)
+        self.currency_names[key] = (currency, monotonic())
+        return currency
+
     async def cost_check(self, ctx: t.Union[commands.Context, discord.Interaction]):
         return await self._cost_check(ctx, ctx.author if isinstance(ctx, commands.Context) else ctx.user)
 
@@ -64,7 +83,7 @@ class Checks(MixinMeta):
             cost_obj.update_usage(user.id)
             return True
 
-        currency = await get_cached_credits_name(ctx.guild)
+        currency = await self.get_credits_name(ctx.guild)
         is_broke = _("You do not have enough {} to run that command! (Need {})").format(currency, humanize_number(cost))
         notify = _("{}, you spent {} to run this command").format(
             user.display_name, f"{humanize_number(cost)} {currency}"
@@ -94,12 +113,12 @@ class Checks(MixinMeta):
                     raise ValueError(f"Invalid prompt type: {cost_obj.prompt}")
                 if not yes:
                     txt = _("Not running `{}`.").format(command_name)
-                    asyncio.create_task(edit_delete_delay(message, txt, del_delay))
+                    self.spawn_task(edit_delete_delay(message, txt, del_delay))
                     raise commands.UserFeedbackCheckFailure()
             if message:
-                asyncio.create_task(edit_delete_delay(message, notify, del_delay))
+                self.spawn_task(edit_delete_delay(message, notify, del_delay))
             else:
-                asyncio.create_task(ctx.send(notify, delete_after=del_delay))
+                self.spawn_task(ctx.send(notify, delete_after=del_delay))
 
         try:
             await bank.withdraw_credits(user, cost)
@@ -107,7 +126,7 @@ class Checks(MixinMeta):
             if isinstance(ctx, commands.Context):
                 self.charged[ctx_to_id(ctx)] = cost
             elif cost_obj.prompt != "silent":
-                asyncio.create_task(ctx.channel.send(notify, delete_after=del_delay))
+                self.spawn_task(ctx.channel.send(notify, delete_after=del_delay))
             return True
         except ValueError:
             log.debug(f"Failed to charge {user.name} for '{command_name}' - cost: {cost} {currency}")
@@ -139,11 +158,11 @@ class Checks(MixinMeta):
         amount: int = ctx.args[-1]
 
         deduction = math.ceil(amount * tax)
-        asyncio.create_task(bank.withdraw_credits(ctx.author, deduction))
+        self.spawn_task(bank.withdraw_credits(ctx.author, deduction))
         # Modify the amount to be transferred
         ctx.args[-1] = amount - deduction
 
-        currency = await get_cached_credits_name(ctx.guild)
+        currency = await self.get_credits_name(ctx.guild)
         txt = _("{}% transfer tax applied, {} deducted from transfer").format(
             f"{round(tax * 100)}", f"{humanize_number(deduction)} {currency}"
         )
@@ -46,6 +46,9 @@ class Listeners(MixinMeta):
         if not ctx.command:
             return
         self.charged.pop(ctx_to_id(ctx), None)
+        if ctx.command.qualified_name == "bankset creditsname":
+            # Red doesn't dispatch an event when the currency name changes
+            self.currency_names.clear()
 
     @commands.Cog.listener()
     async def on_cog_add(self, cog: commands.Cog):
@@ -203,6 +206,7 @@ class Listeners(MixinMeta):
     @commands.Cog.listener()
     async def on_red_bank_set_global(self, is_global: bool):
         """is_global: True if global bank, False if server bank"""
+        self.currency_names.clear()
         txt = _("Bank has been set to Global!") if is_global else _("Bank has been set to per-server!")
         log_channel_id = self.db.logs.set_global or self.db.logs.default_log_channel
         if not log_channel_id:
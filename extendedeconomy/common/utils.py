@@ -4,8 +4,7 @@ import typing as t
 from io import StringIO
 
 import discord
-from aiocache import cached
-from redbot.core import bank, commands
+from redbot.core import commands
 from redbot.core.bot import Red
 from redbot.core.i18n import Translator
 from redbot.core.utils.chat_formatting import humanize_number, humanize_timedelta
@@ -56,11 +55,6 @@ def ctx_to_dict(c: t.Union[commands.Context, discord.Interaction]):
     return json.dumps(info, indent=2)
 
 
-@cached(ttl=600)
-async def get_cached_credits_name(guild: discord.Guild) -> str:
-    return await bank.get_currency_name(guild)
-
-
 def has_cost_check(command: CTYPES):
     """Check if a command already has the cost check attached to it"""
     for check in command.checks:
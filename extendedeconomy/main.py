@@ -46,6 +46,8 @@ class ExtendedEconomy(
         self.saving = False
         self.checks = set()
         self.charged: t.Dict[str, int] = {}  # Commands that were successfully charged credits
+        self.currency_names: t.Dict[int, t.Tuple[str, float]] = {}  # GuildID (0 for DMs): (Currency name, fetched at)
+        self.background_tasks: t.Set[asyncio.Task] = set()  # Fire and forget tasks from the cost checks
 
         # Overrides
         self.payday_callback = None
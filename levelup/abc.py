@@ -11,6 +11,7 @@ from redbot.core import commands
 from redbot.core.bot import Red
 
 from .common.models import DB, GuildSettings, Profile, VoiceTracking
+from .common.utils import ProfileCache
 from .generator.tenor.converter import TenorAPI
 
 
@@ -28,7 +29,7 @@ class MixinMeta(ABC):
         self.db: DB
         self.lastmsg: t.Dict[int, t.Dict[int, float]]
         self.voice_tracking: t.Dict[int, t.Dict[int, VoiceTracking]]
-        self.profile_cache: t.Dict[int, t.Dict[int, t.Tuple[str, bytes]]]
+        self.profile_cache: ProfileCache
         self.stars: t.Dict[int, t.Dict[int, datetime]]
 
         self.cog_path: Path
@@ -1,6 +1,7 @@
 PROFILE_TYPES = ["default", "runescape"]
 STATIC_FONT_STYLES = ["runescape"]
 LOADING = "https://i.imgur.com/l3p6EMX.gif"
+PROFILE_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Total size of cached profile images before the oldest get evicted
 COLORS = {
     "cloudy blue": "#acc2d9",
     "dark pastel green": "#56ae57",
@@ -11,7 +11,7 @@ from uuid import uuid4
 
 import discord
 import orjson
-from pydantic import VERSION, BaseModel, Field
+from pydantic import VERSION, BaseModel, Field, ValidationError
 from redbot.core.bot import Red
 
 from .utils import get_twemoji
@@ -47,6 +47,14 @@ class Base(BaseModel):
             return self.model_dump_json(**kwargs)
         return self.json(**kwargs)
 
+    def dumpjson_bytes(self, exclude_defaults: bool = True, pretty: bool = False) -> bytes:
+        """Same as dumpjson but skips decoding the serialized json into a str"""
+        if VERSION >= "2.0.1":
+            return self.__pydantic_serializer__.to_json(
+                self, indent=2 if pretty else None, exclude_defaults=exclude_defaults
+            )
+        return self.dumpjson(exclude_defaults=exclude_defaults, pretty=pretty).encode("utf-8")
+
     @classmethod
     def from_file(cls, path: Path) -> Base:
         if not path.exists():
@@ -54,15 +62,19 @@ class Base(BaseModel):
         if not path.is_file():
             raise IsADirectoryError(f"Path is not a file: {path}")
         if VERSION >= "2.0.1":
-            text = path.read_text()
+            # Pydantic parses the raw bytes directly, no need to decode them into a str first
+            raw = path.read_bytes()
             try:
-                return cls.model_validate_json(text)
-            except UnicodeDecodeError as e:
+                return cls.model_validate_json(raw)
+            except ValidationError as e:
+                # Invalid json (including invalid utf-8) is reported as a json_invalid error rather than raised
+                if not any(err["type"] == "json_invalid" for err in e.errors()):
+                    raise
                 log.warning(f"Failed to load {path}, attempting to load via json5")
                 try:
                     import json5
 
-                    data = json5.loads(text)
+                    data = json5.loads(raw.decode("utf-8", errors="replace"))
                     return cls.model_validate(data)
                 except ImportError:
                     log.error("Failed to load via json5")
@@ -87,11 +99,11 @@ class Base(BaseModel):
         max_backups: int = 3,
         interval: int = 3600,
     ) -> None:
-        dump = self.dumpjson(exclude_defaults=True, pretty=pretty)
+        dump = self.dumpjson_bytes(exclude_defaults=True, pretty=pretty)
         # We want to write the file as safely as possible
         # https://github.com/Cog-Creators/Red-DiscordBot/blob/V3/develop/redbot/core/_drivers/json.py#L224
         tmp_path = path.parent / f"{path.stem}-{uuid4().fields[0]}.tmp"
-        with tmp_path.open(encoding="utf-8", mode="w") as fs:
+        with tmp_path.open(mode="wb") as fs:
             fs.write(dump)
             fs.flush()  # This does get closed on context exit, ...
             os.fsync(fs.fileno())  # but that needs to happen prior to this line
@@ -6,6 +6,7 @@ import random
 import re
 import sys
 import typing as t
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from io import StringIO
 
@@ -42,6 +43,34 @@ ID_REGEX: t.Pattern = re.compile(r"[0-9]{17,}")
 VALID_CONTENT_TYPES = ("image/png", "image/jpeg", "image/jpg", "image/gif")
 
 
+class ProfileCache:
+    """Least recently used cache of (last_used, image bytes) keyed by (guild_id, user_id), capped by total image size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[t.Tuple[int, int], t.Tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: t.Tuple[int, int]) -> t.Optional[t.Tuple[float, bytes]]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: t.Tuple[int, int], value: t.Tuple[float, bytes]) -> None:
+        if old := self.entries.pop(key, None):
+            self.size -= len(old[1])
+        self.entries[key] = value
+        self.size += len(value[1])
+        # Always keep the entry that was just added
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            _key, (_last_used, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
 def string_to_rgb(color: str, as_discord_color: bool = False) -> t.Union[t.Tuple[int, int, int], discord.Color]:
     if not color:
         # Return white
@@ -43,7 +43,9 @@ from redbot.core.utils.chat_formatting import box, humanize_list
 from .abc import CompositeMetaClass
 from .commands import Commands
 from .commands.user import view_profile_context
+from .common.const import PROFILE_CACHE_MAX_BYTES
 from .common.models import DB, VoiceTracking, run_migrations
+from .common.utils import ProfileCache
 from .dashboard.integration import DashboardIntegration
 from .generator import api
 from .generator.tenor.converter import TenorAPI
@@ -90,7 +92,7 @@ class LevelUp(
         # Cache
         self.db: DB = DB()
         self.lastmsg: t.Dict[int, t.Dict[int, float]] = {}  # GuildID: {UserID: LastMessageTime}
-        self.profile_cache: t.Dict[int, t.Dict[int, t.Tuple[str, bytes]]] = {}  # GuildID: {UserID: (last_used, bytes)}
+        self.profile_cache = ProfileCache(PROFILE_CACHE_MAX_BYTES)  # (GuildID, UserID): (last_used, bytes)
         self.stars: t.Dict[int, t.Dict[int, datetime]] = {}  # Guild_ID: {User_ID: {User_ID: datetime}}
 
         # {guild_id: {member_id: tracking_data}}
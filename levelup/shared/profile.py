@@ -323,13 +323,14 @@ class ProfileFormatting(MixinMeta):
         if not self.db.cache_seconds:
             return await self.get_user_profile(member)
         now = perf_counter()
-        cachedata = self.profile_cache.setdefault(member.guild.id, {}).get(member.id)
+        key = (member.guild.id, member.id)
+        cachedata = self.profile_cache.get(key)
         if cachedata is None:
             file = await self.get_user_profile(member)
             if not isinstance(file, discord.File):
                 return file
             filebytes = file.fp.read()
-            self.profile_cache[member.guild.id][member.id] = (now, filebytes)
+            self.profile_cache.set(key, (now, filebytes))
             return discord.File(BytesIO(filebytes), filename="profile.webp")
 
         last_used, imgbytes = cachedata
@@ -340,5 +341,5 @@ class ProfileFormatting(MixinMeta):
         if not isinstance(file, discord.File):
             return file
         filebytes = file.fp.read()
-        self.profile_cache[member.guild.id][member.id] = (now, filebytes)
+        self.profile_cache.set(key, (now, filebytes))
         return discord.File(BytesIO(filebytes), filename="profile.webp")
@@ -55,10 +55,7 @@ async def can_close(
 
 
 async def fetch_channel_history(channel: discord.TextChannel, limit: int | None = None) -> List[discord.Message]:
-    history = []
-    async for msg in channel.history(oldest_first=True, limit=limit):
-        history.append(msg)
-    return history
+    return [msg async for msg in channel.history(oldest_first=True, limit=limit)]
 
 
 async def ticket_owner_hastyped(channel: discord.TextChannel, user: discord.Member) -> bool: